@@ -1,5 +1,7 @@
 import boto3
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # -----------------------
@@ -17,7 +19,14 @@ logger = logging.getLogger(__name__)
 region = "us-east-1"   # change if needed
 BUCKET_NAME = "dp-datawarehouse-solution-1"  # must be unique globally
 
-s3 = boto3.client("s3", region_name=region)
+# keep-alive + pooled connections (folder markers are written concurrently)
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+s3 = boto3.client("s3", region_name=region, config=BOTO_CONFIG)
 
 def create_bucket():
     try:
@@ -55,11 +64,16 @@ def enable_versioning_and_encryption():
     )
     logger.info("🔑 Default encryption enabled")
 
+def create_folder(folder):
+    # zero-byte marker so the prefix shows up as a folder in the console
+    s3.put_object(Bucket=BUCKET_NAME, Key=folder, Body=b"", ContentLength=0)
+    logger.info(f"📂 Created folder {folder} in {BUCKET_NAME}")
+
 def create_folders():
     folders = ["raw/", "transformed/", "curated/", "glue_scripts/"]
-    for f in folders:
-        s3.put_object(Bucket=BUCKET_NAME, Key=f)
-        logger.info(f"📂 Created folder {f} in {BUCKET_NAME}")
+    # independent PUTs → issue them in parallel instead of one round-trip each
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(create_folder, folders))
 
 if __name__ == "__main__":
     create_bucket()
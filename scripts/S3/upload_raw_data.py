@@ -1,6 +1,9 @@
 import os
 import boto3
+from concurrent.futures import ThreadPoolExecutor
 import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import kagglehub as kh
 import logging
 import shutil
@@ -22,10 +25,26 @@ S3_KEY = "raw/amazon_products_sales_data_uncleaned.csv"
 LOCAL_DATASET_DIR = r"D:\datawarehouse-solution\dataset"
 LOCAL_FILE_NAME = "amazon_products_sales_data_uncleaned.csv"
 
+# Multipart upload tuning: the raw CSV is ~38.5 MB, so 8 MiB parts split it into
+# ~5 parts that upload in parallel (larger parts would fall back to a single PUT)
+MB = 1024 * 1024
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * MB,
+    multipart_chunksize=8 * MB,
+    max_concurrency=16,
+    use_threads=True
+)
+
 # Detect AWS region automatically (fallback to us-east-1)
 session = boto3.session.Session()
 region = session.region_name or "us-east-1"
-s3 = session.client("s3", region_name=region)
+# pool must be larger than max_concurrency so upload threads don't wait on connections
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+s3 = session.client("s3", region_name=region, config=BOTO_CONFIG)
 
 # -----------------------
 # Functions
@@ -52,8 +71,8 @@ def download_from_kaggle():
     raise FileNotFoundError(f"❌ Could not find uncleaned CSV in {path}")
 
 
-def upload_to_s3(file_path):
-    """Upload dataset to S3 bucket (overwrites if already exists)."""
+def check_existing_s3_object():
+    """Warn if the raw dataset is already in S3 (it will be overwritten)."""
     try:
         s3.head_object(Bucket=BUCKET_NAME, Key=S3_KEY)
         logger.warning(f"⚠️ File already exists in S3: s3://{BUCKET_NAME}/{S3_KEY} (will overwrite)")
@@ -63,22 +82,37 @@ def upload_to_s3(file_path):
         else:
             raise
 
+
+def upload_to_s3(file_path):
+    """Upload dataset to S3 bucket (overwrites if already exists)."""
     logger.info(f"⬆️ Uploading {file_path} → s3://{BUCKET_NAME}/{S3_KEY}")
-    s3.upload_file(file_path, BUCKET_NAME, S3_KEY)
+    # upload_file reads each part lazily from disk instead of buffering the body in memory
+    s3.upload_file(file_path, BUCKET_NAME, S3_KEY, Config=TRANSFER_CONFIG)
     logger.info(f"✅ Upload complete: s3://{BUCKET_NAME}/{S3_KEY}")
 
 
 def verify_s3_upload():
     """Verify uploaded file exists in S3."""
     logger.info("🔎 Verifying S3 upload...")
-    response = s3.list_objects_v2(Bucket=BUCKET_NAME, Prefix="raw/")
-
-    if "Contents" not in response:
-        logger.error("❌ No files found under prefix 'raw/'.")
-        return
-
-    for obj in response["Contents"]:
-        logger.info(f"📂 Found in S3: {obj['Key']} ({obj['Size']} bytes)")
+    paginator = s3.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=BUCKET_NAME,
+        Prefix="raw/",
+        PaginationConfig={"PageSize": 1000}
+    )
+
+    # JMESPath filter across all pages → only the uploaded key is materialized
+    found = False
+    for match in pages.search(f"Contents[?Key=='{S3_KEY}'].[Key, Size]"):
+        # a page without Contents (e.g. empty prefix) evaluates to null
+        if match is None:
+            continue
+        key, size = match
+        logger.info(f"📂 Found in S3: {key} ({size} bytes)")
+        found = True
+
+    if not found:
+        logger.error(f"❌ {S3_KEY} not found under prefix 'raw/'.")
 
 
 def copy_to_local(file_path):
@@ -88,8 +122,16 @@ def copy_to_local(file_path):
         logger.info(f"📂 Created local dataset folder: {LOCAL_DATASET_DIR}")
 
     dest_path = os.path.join(LOCAL_DATASET_DIR, os.path.basename(LOCAL_FILE_NAME))
-    shutil.copy(file_path, dest_path)
-    logger.info(f"✅ Copied dataset to local folder: {dest_path}")
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+
+    # Hardlink avoids rewriting the bytes; fall back to a real copy across filesystems
+    try:
+        os.link(file_path, dest_path)
+        logger.info(f"✅ Linked dataset into local folder: {dest_path}")
+    except OSError:
+        shutil.copy(file_path, dest_path)
+        logger.info(f"✅ Copied dataset to local folder: {dest_path}")
     return dest_path
 
 
@@ -105,7 +147,13 @@ def verify_local_copy(dest_path):
 def main_ingest():
     """End-to-end ingestion pipeline."""
     logger.info("🚀 Starting Kaggle → S3 → Local ingestion pipeline...")
-    file_path = download_from_kaggle()
+    # the S3 existence probe doesn't depend on the download → overlap them
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        download = executor.submit(download_from_kaggle)
+        s3_check = executor.submit(check_existing_s3_object)
+    s3_check.result()
+    file_path = download.result()
+
     upload_to_s3(file_path)
     dest_path = copy_to_local(file_path)
     verify_s3_upload()
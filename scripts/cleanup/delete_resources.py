@@ -1,5 +1,8 @@
 import boto3
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 
 # -----------------------
 # Logging setup
@@ -11,15 +14,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # -----------------------
-# AWS Clients
+# AWS Clients (one shared session)
 # -----------------------
-events = boto3.client("events")
-lambda_client = boto3.client("lambda")
-glue = boto3.client("glue")
-redshift = boto3.client("redshift-serverless")
-s3 = boto3.client("s3")
-iam = boto3.client("iam")
-sts = boto3.client("sts")
+session = boto3.session.Session()
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+events = session.client("events", config=BOTO_CONFIG)
+lambda_client = session.client("lambda", config=BOTO_CONFIG)
+glue = session.client("glue", config=BOTO_CONFIG)
+redshift = session.client("redshift-serverless", config=BOTO_CONFIG)
+s3 = session.client("s3", config=BOTO_CONFIG)
+iam = session.client("iam", config=BOTO_CONFIG)
+sts = session.client("sts", config=BOTO_CONFIG)
 account_id = sts.get_caller_identity()["Account"]
 
 # -----------------------
@@ -27,9 +37,12 @@ account_id = sts.get_caller_identity()["Account"]
 # -----------------------
 BUCKET_NAME = "dp-datawarehouse-solution-1"
 EVENT_RULE = "trigger-lambda1-every-10min"   
+S3_EVENT_RULE = "trigger-glue-split-on-transform"
+GLUE_WORKFLOW = "split-fact-dim-workflow"
+GLUE_TRIGGER = "split-fact-dim-on-transform"
 LAMBDAS = [
     "lambda-trigger-glue",      # Lambda 1
-    "lambda-split-fact-dim",    # Lambda 2
+    "lambda-split-fact-dim",    # Lambda 2 (legacy, replaced by S3_EVENT_RULE)
     "lambda-load-redshift"      # Lambda 3
 ]
 WORKGROUP_NAME = "dw-workgroup"    
@@ -38,53 +51,88 @@ IAM_ROLES = [
     "glue-etl-role",
     "lambda-etl-role",
     "redshift-copy-role",
-    "glue-crawler-role"
+    "glue-crawler-role",
+    "eventbridge-glue-role"
 ]
+# local role ARN cache written by create_iam_roles.py (dropped whole → next run re-checks IAM)
+IAM_ROLE_CACHE_FILE = os.path.expanduser("~/.cache/dw_iam_roles.json")
+GLUE_JOBS = ["glue-clean-transform", "glue-split-fact-dim"]
+# Align names to those used in deploy_lambdas.py / lambda_3.py
+GLUE_CRAWLER = "product-data-crawler"
+GLUE_DATABASE = "product_db"
+
+MAX_WORKERS = 8   # parallel control-plane calls per cleanup step
+S3_DELETE_WORKERS = 16   # parallel delete_objects batches
 
 # -----------------------
 # Cleanup Steps
 # -----------------------
-def delete_eventbridge():
+def delete_eventbridge_rule(rule):
     try:
-        events.remove_targets(Rule=EVENT_RULE, Ids=["1"])
-        events.delete_rule(Name=EVENT_RULE, Force=True)
-        logger.info(f"✅ Deleted EventBridge rule {EVENT_RULE}")
+        events.remove_targets(Rule=rule, Ids=["1"])
+        events.delete_rule(Name=rule, Force=True)
+        logger.info(f"✅ Deleted EventBridge rule {rule}")
     except Exception as e:
-        logger.warning(f"⚠️ EventBridge cleanup skipped: {e}")
+        logger.warning(f"⚠️ EventBridge cleanup skipped for {rule}: {e}")
 
-def delete_lambdas():
-    for fn in LAMBDAS:
-        try:
-            lambda_client.delete_function(FunctionName=fn)
-            logger.info(f"✅ Deleted Lambda {fn}")
-        except Exception as e:
-            logger.warning(f"⚠️ Lambda {fn} not deleted: {e}")
+def delete_eventbridge():
+    run_parallel(delete_eventbridge_rule, [EVENT_RULE, S3_EVENT_RULE])
 
-def delete_glue():
-    # Delete both Glue jobs
-    for job in ["glue-clean-transform", "glue-split-fact-dim"]:
+def run_parallel(fn, items):
+    """Run independent delete calls concurrently; each call handles its own errors."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(fn, item) for item in items]
+    for future in futures:
         try:
-            glue.delete_job(JobName=job)
-            logger.info(f"✅ Deleted Glue job {job}")
+            future.result()
         except Exception as e:
-            logger.warning(f"⚠️ Glue job {job} not deleted: {e}")
+            logger.warning(f"⚠️ Cleanup task failed: {e}")
 
-    # Align names to those used in deploy_lambdas.py / lambda_3.py
-    GLUE_CRAWLER = "product-data-crawler"
-    GLUE_DATABASE = "product_db"
+def delete_lambda(fn):
+    try:
+        lambda_client.delete_function(FunctionName=fn)
+        logger.info(f"✅ Deleted Lambda {fn}")
+    except Exception as e:
+        logger.warning(f"⚠️ Lambda {fn} not deleted: {e}")
 
+def delete_lambdas():
+    run_parallel(delete_lambda, LAMBDAS)
+
+def delete_glue_job(job):
+    try:
+        glue.delete_job(JobName=job)
+        logger.info(f"✅ Deleted Glue job {job}")
+    except Exception as e:
+        logger.warning(f"⚠️ Glue job {job} not deleted: {e}")
+
+def delete_glue_crawler():
     try:
         glue.delete_crawler(Name=GLUE_CRAWLER)
         logger.info(f"✅ Deleted Glue crawler {GLUE_CRAWLER}")
     except Exception as e:
         logger.warning(f"⚠️ Glue crawler not deleted: {e}")
 
+def delete_glue_database():
     try:
         glue.delete_database(Name=GLUE_DATABASE)
         logger.info(f"✅ Deleted Glue database {GLUE_DATABASE}")
     except Exception as e:
         logger.warning(f"⚠️ Glue database not deleted: {e}")
 
+def delete_glue_workflow():
+    try:
+        glue.delete_trigger(Name=GLUE_TRIGGER)
+        glue.delete_workflow(Name=GLUE_WORKFLOW)
+        logger.info(f"✅ Deleted Glue workflow {GLUE_WORKFLOW}")
+    except Exception as e:
+        logger.warning(f"⚠️ Glue workflow not deleted: {e}")
+
+def delete_glue():
+    # Jobs, crawler, database and workflow are independent → delete them all at once
+    tasks = [lambda job=job: delete_glue_job(job) for job in GLUE_JOBS]
+    tasks += [delete_glue_crawler, delete_glue_database, delete_glue_workflow]
+    run_parallel(lambda task: task(), tasks)
+
 def delete_redshift():
     try:
         redshift.delete_workgroup(workgroupName=WORKGROUP_NAME)
@@ -98,28 +146,68 @@ def delete_redshift():
     except Exception as e:
         logger.warning(f"⚠️ Redshift namespace not deleted: {e}")
 
+def delete_object_batch(objects):
+    """Delete up to 1000 object versions / delete markers in a single call."""
+    response = s3.delete_objects(
+        Bucket=BUCKET_NAME,
+        Delete={"Objects": objects, "Quiet": True}
+    )
+    for err in response.get("Errors", []):
+        logger.warning(f"⚠️ Could not delete {err['Key']} ({err.get('VersionId')}): {err['Message']}")
+    return len(objects) - len(response.get("Errors", []))
+
+def empty_bucket():
+    """Remove every object version and delete marker, one page (≤1000 keys) per request."""
+    paginator = s3.get_paginator("list_object_versions")
+    with ThreadPoolExecutor(max_workers=S3_DELETE_WORKERS) as executor:
+        futures = []
+        for page in paginator.paginate(Bucket=BUCKET_NAME):
+            batch = [
+                {"Key": v["Key"], "VersionId": v["VersionId"]}
+                for v in page.get("Versions", []) + page.get("DeleteMarkers", [])
+            ]
+            if batch:
+                futures.append(executor.submit(delete_object_batch, batch))
+        deleted = sum(f.result() for f in futures)
+    logger.info(f"🧹 Removed {deleted} object versions from {BUCKET_NAME}")
+
 def delete_s3():
     try:
-        # Delete all objects in bucket
-        s3_resource = boto3.resource("s3")
-        bucket = s3_resource.Bucket(BUCKET_NAME)
-        bucket.objects.all().delete()
-        bucket.object_versions.delete()
-        bucket.delete()
+        empty_bucket()
+        s3.delete_bucket(Bucket=BUCKET_NAME)
         logger.info(f"✅ Deleted S3 bucket {BUCKET_NAME}")
     except Exception as e:
         logger.warning(f"⚠️ S3 bucket not deleted: {e}")
 
+def delete_iam_role(role):
+    try:
+        attached_policies = iam.list_attached_role_policies(RoleName=role)["AttachedPolicies"]
+        inline_policies = iam.list_role_policies(RoleName=role)["PolicyNames"]
+        # detach/delete all policies in parallel, then delete the role once they are gone
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            detached = executor.map(
+                lambda p: iam.detach_role_policy(RoleName=role, PolicyArn=p["PolicyArn"]),
+                attached_policies
+            )
+            deleted = executor.map(
+                lambda name: iam.delete_role_policy(RoleName=role, PolicyName=name),
+                inline_policies
+            )
+            list(detached)
+            list(deleted)
+        iam.delete_role(RoleName=role)
+        logger.info(f"✅ Deleted IAM role {role}")
+    except Exception as e:
+        logger.warning(f"⚠️ IAM role {role} not deleted: {e}")
+
 def delete_iam_roles():
-    for role in IAM_ROLES:
-        try:
-            attached_policies = iam.list_attached_role_policies(RoleName=role)["AttachedPolicies"]
-            for p in attached_policies:
-                iam.detach_role_policy(RoleName=role, PolicyArn=p["PolicyArn"])
-            iam.delete_role(RoleName=role)
-            logger.info(f"✅ Deleted IAM role {role}")
-        except Exception as e:
-            logger.warning(f"⚠️ IAM role {role} not deleted: {e}")
+    run_parallel(delete_iam_role, IAM_ROLES)
+    # the cached ARNs point at roles that no longer exist
+    try:
+        os.remove(IAM_ROLE_CACHE_FILE)
+        logger.info(f"✅ Removed IAM role cache {IAM_ROLE_CACHE_FILE}")
+    except FileNotFoundError:
+        pass
 
 # -----------------------
 # Main
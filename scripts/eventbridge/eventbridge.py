@@ -1,12 +1,25 @@
 import boto3
 import logging
+from botocore.config import Config
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
-events = boto3.client("events")
-lambda_client = boto3.client("lambda")
+session = boto3.session.Session()
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+events = session.client("events", config=BOTO_CONFIG)
+lambda_client = session.client("lambda", config=BOTO_CONFIG)
+sts = session.client("sts", config=BOTO_CONFIG)
+
+# resolved once per run instead of inside every ARN
+ACCOUNT_ID = sts.get_caller_identity()["Account"]
+REGION = events.meta.region_name
 
 RULE_NAME = "trigger-lambda1-every-10min"
 LAMBDA_NAME = "lambda-trigger-glue"
@@ -42,7 +55,7 @@ def add_lambda_target():
             StatementId=f"{RULE_NAME}-permission",
             Action="lambda:InvokeFunction",
             Principal="events.amazonaws.com",
-            SourceArn=f"arn:aws:events:{events.meta.region_name}:{boto3.client('sts').get_caller_identity()['Account']}:rule/{RULE_NAME}"
+            SourceArn=f"arn:aws:events:{REGION}:{ACCOUNT_ID}:rule/{RULE_NAME}"
         )
         logger.info(f"✅ Added permission for EventBridge to invoke {LAMBDA_NAME}")
     except lambda_client.exceptions.ResourceConflictException:
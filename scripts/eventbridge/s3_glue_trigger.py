@@ -0,0 +1,130 @@
+import boto3
+import json
+import logging
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# -----------------------
+# AWS clients (one shared session)
+# -----------------------
+session = boto3.session.Session()
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+events = session.client("events", config=BOTO_CONFIG)
+glue = session.client("glue", config=BOTO_CONFIG)
+s3 = session.client("s3", config=BOTO_CONFIG)
+sts = session.client("sts", config=BOTO_CONFIG)
+
+ACCOUNT_ID = sts.get_caller_identity()["Account"]
+REGION = events.meta.region_name
+
+# -----------------------
+# Config
+# -----------------------
+BUCKET_NAME = "dp-datawarehouse-solution-1"
+GLUE_JOB_NAME = "glue-split-fact-dim"
+WORKFLOW_NAME = "split-fact-dim-workflow"
+TRIGGER_NAME = "split-fact-dim-on-transform"
+RULE_NAME = "trigger-glue-split-on-transform"
+EVENTS_ROLE_NAME = "eventbridge-glue-role"   # created by create_iam_roles.py
+LEGACY_LAMBDA_NAME = "lambda-split-fact-dim"  # replaced by this rule
+
+WORKFLOW_ARN = f"arn:aws:glue:{REGION}:{ACCOUNT_ID}:workflow/{WORKFLOW_NAME}"
+EVENTS_ROLE_ARN = f"arn:aws:iam::{ACCOUNT_ID}:role/{EVENTS_ROLE_NAME}"
+
+# S3 "Object Created" events for parquet files under transformed/
+EVENT_PATTERN = {
+    "source": ["aws.s3"],
+    "detail-type": ["Object Created"],
+    "detail": {
+        "bucket": {"name": [BUCKET_NAME]},
+        "object": {"key": [{"wildcard": "transformed/*.parquet"}]}
+    }
+}
+
+# -----------------------
+# 1️⃣ Send bucket events to EventBridge
+# -----------------------
+def enable_s3_eventbridge():
+    """Turn on EventBridge delivery for the bucket (keeps other notifications)"""
+    config = s3.get_bucket_notification_configuration(Bucket=BUCKET_NAME)
+    config.pop("ResponseMetadata", None)
+
+    # the old S3 → Lambda 2 hop is no longer deployed
+    config["LambdaFunctionConfigurations"] = [
+        cfg for cfg in config.get("LambdaFunctionConfigurations", [])
+        if not cfg.get("LambdaFunctionArn", "").endswith(f":function:{LEGACY_LAMBDA_NAME}")
+    ]
+    config["EventBridgeConfiguration"] = {}
+
+    s3.put_bucket_notification_configuration(
+        Bucket=BUCKET_NAME,
+        NotificationConfiguration=config
+    )
+    logger.info(f"✅ EventBridge notifications enabled on {BUCKET_NAME}")
+
+# -----------------------
+# 2️⃣ Glue workflow + event trigger → Glue Job 2
+# -----------------------
+def create_glue_workflow():
+    try:
+        glue.create_workflow(
+            Name=WORKFLOW_NAME,
+            Description="Runs glue-split-fact-dim when transformed/ parquet lands in S3"
+        )
+        logger.info(f"✅ Created Glue workflow {WORKFLOW_NAME}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "AlreadyExistsException":
+            raise
+        logger.info(f"ℹ️ Glue workflow {WORKFLOW_NAME} already exists")
+
+    try:
+        glue.create_trigger(
+            Name=TRIGGER_NAME,
+            WorkflowName=WORKFLOW_NAME,
+            Type="EVENT",
+            Actions=[{
+                "JobName": GLUE_JOB_NAME,
+                "Arguments": {
+                    "--BUCKET_NAME": BUCKET_NAME,
+                    "--INPUT_KEY": "transformed/"
+                }
+            }],
+            # one job run per burst of parquet part files instead of one per file
+            EventBatchingCondition={"BatchSize": 100, "BatchWindow": 120}
+        )
+        logger.info(f"✅ Created Glue event trigger {TRIGGER_NAME}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "AlreadyExistsException":
+            raise
+        logger.info(f"ℹ️ Glue trigger {TRIGGER_NAME} already exists")
+
+# -----------------------
+# 3️⃣ EventBridge rule → Glue workflow
+# -----------------------
+def create_eventbridge_rule():
+    events.put_rule(
+        Name=RULE_NAME,
+        EventPattern=json.dumps(EVENT_PATTERN),
+        State="ENABLED",
+        Description="Start Glue Job 2 (split fact/dim) when transformed/ parquet is written"
+    )
+    events.put_targets(
+        Rule=RULE_NAME,
+        Targets=[{"Id": "1", "Arn": WORKFLOW_ARN, "RoleArn": EVENTS_ROLE_ARN}]
+    )
+    logger.info(f"✅ EventBridge rule {RULE_NAME} → {WORKFLOW_NAME}")
+
+if __name__ == "__main__":
+    enable_s3_eventbridge()
+    create_glue_workflow()
+    create_eventbridge_rule()
+    logger.info(f"🎯 transformed/ uploads now start '{GLUE_JOB_NAME}' directly (no Lambda hop)")
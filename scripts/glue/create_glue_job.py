@@ -1,5 +1,8 @@
 import boto3
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 # -----------------------
 # logging setup
@@ -13,9 +16,15 @@ logger = logging.getLogger(__name__)
 # -----------------------
 # boto3 clients
 # -----------------------
-glue = boto3.client("glue")
-sts = boto3.client("sts")
-iam = boto3.client("iam")
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+glue = boto3.client("glue", config=BOTO_CONFIG)
+sts = boto3.client("sts", config=BOTO_CONFIG)
+iam = boto3.client("iam", config=BOTO_CONFIG)
 
 # -----------------------
 # config
@@ -56,11 +65,8 @@ def verify_role_exists(role_name):
 
 def create_or_update_glue_job(job_name, script_path, description, role_arn):
     """Create Glue ETL job if not exists"""
+    # create directly and treat "already exists" as success → one call per job, no get/create race
     try:
-        glue.get_job(JobName=job_name)
-        logger.info(f"ℹ️ Glue job '{job_name}' already exists.")
-    except glue.exceptions.EntityNotFoundException:
-        logger.info(f"🛠 Creating Glue job '{job_name}' ...")
         glue.create_job(
             Name=job_name,
             Role=role_arn,
@@ -78,7 +84,13 @@ def create_or_update_glue_job(job_name, script_path, description, role_arn):
             NumberOfWorkers=2,
             Description=description
         )
+        logger.info(f"🛠 Creating Glue job '{job_name}' ...")
         logger.info(f"✅ Glue job '{job_name}' created successfully.")
+    except ClientError as e:
+        # an existing job with a different definition can surface as IdempotentParameterMismatch
+        if e.response["Error"]["Code"] not in ("AlreadyExistsException", "IdempotentParameterMismatchException"):
+            raise
+        logger.info(f"ℹ️ Glue job '{job_name}' already exists.")
 
 # -----------------------
 # main
@@ -89,10 +101,17 @@ if __name__ == "__main__":
 
     role_arn = get_role_arn(ROLE_NAME)
 
-    for job in GLUE_JOBS:
-        create_or_update_glue_job(
-            job_name=job["Name"],
-            script_path=job["ScriptPath"],
-            description=job["Description"],
-            role_arn=role_arn
-        )
+    # jobs are independent → register them concurrently
+    with ThreadPoolExecutor(max_workers=len(GLUE_JOBS)) as executor:
+        futures = [
+            executor.submit(
+                create_or_update_glue_job,
+                job_name=job["Name"],
+                script_path=job["ScriptPath"],
+                description=job["Description"],
+                role_arn=role_arn
+            )
+            for job in GLUE_JOBS
+        ]
+    for future in futures:
+        future.result()
@@ -3,6 +3,7 @@ from pyspark.context import SparkContext
 from awsglue.context import GlueContext
 from awsglue.job import Job
 from pyspark.sql import functions as F
+from pyspark.sql.types import StructType, StructField, StringType
 from awsglue.utils import getResolvedOptions
 import os
 import logging
@@ -26,27 +27,46 @@ job.init("glue-clean-transform", {})
 RAW_PATH = "s3://dp-datawarehouse-solution-1/raw/amazon_products_sales_data_uncleaned.csv"
 TRANSFORMED_PATH = "s3://dp-datawarehouse-solution-1/transformed/"
 
+# -----------------------
+# Raw CSV schema
+# -----------------------
+# Every column is read as string (values are trimmed and cast below anyway),
+# so Spark doesn't need an extra pass over the file to infer types.
+RAW_COLUMNS = [
+    "title", "rating", "number_of_reviews", "bought_in_last_month",
+    "current/discounted_price", "price_on_variant", "listed_price",
+    "is_best_seller", "is_sponsored", "is_couponed", "buy_box_availability",
+    "delivery_details", "sustainability_badges", "image_url", "product_url",
+    "collected_at"
+]
+raw_schema = StructType([StructField(c, StringType(), True) for c in RAW_COLUMNS])
+
 # -----------------------
 # Step 1: Read raw CSV
 # -----------------------
 df = (
     spark.read
+         .schema(raw_schema)
          .option("header", True)
-         .option("inferSchema", True)
+         .option("multiLine", False)
+         .option("escape", '"')
          .option("mode", "PERMISSIVE")  # avoid hard failures on bad rows
          .csv(RAW_PATH)
 )
 # -----------------------
-# Step 2: Column standardization
+# Step 2 + 3: Column standardization and cleaning
 # -----------------------
-df = df.toDF(*[c.strip().lower().replace(" ", "_").replace("/", "_") for c in df.columns])
+def standardize(name):
+    return name.strip().lower().replace(" ", "_").replace("/", "_")
 
-# -----------------------
-# Step 3: Cleaning
-# -----------------------
-df = df.select([F.trim(F.col(c)).alias(c) for c in df.columns])
+def trim_or_null(c):
+    # trim, and turn empty strings into NULL (F.nullif is not available on Glue 4.0 / Spark 3.3)
+    trimmed = F.trim(F.col(f"`{c}`"))
+    return F.when(trimmed != "", trimmed)
+
+# rename + trim + empty→NULL fused into a single projection
+df = df.select([trim_or_null(c).alias(standardize(c)) for c in df.columns])
 df = df.dropDuplicates()
-df = df.replace("", None)
 
 drop_cols = ["product_url", "image_url"]
 for col in drop_cols:
@@ -57,47 +77,82 @@ for col in drop_cols:
 # Step 4: Data type conversions
 # -----------------------
 numeric_cols = ["current_discounted_price", "listed_price", "rating", "number_of_reviews"]
-for col in numeric_cols:
-    if col in df.columns:
-        df = df.withColumn(col, F.regexp_replace(F.col(col), r"[^0-9.]", "").cast("double"))
+# price/review columns are mostly plain numbers with currency symbols and separators,
+# so a character strip + cast handles them; rating ("4.6 out of 5 stars") never
+# matches that and stays on the regex path
+translate_cols = ["current_discounted_price", "listed_price", "number_of_reviews"]
+NUMERIC_NOISE_CHARS = "$,€£ "
 
-if "collected_at" in df.columns:
-    df = df.withColumn("collected_at", F.to_timestamp("collected_at"))
-    df = df.withColumn("crawl_year", F.year("collected_at"))
-    df = df.withColumn("crawl_month", F.month("collected_at"))
+def regex_to_double(expr):
+    return F.regexp_replace(expr, r"[^0-9.]", "").cast("double")
+
+def to_double(c):
+    if c not in translate_cols:
+        return regex_to_double(F.col(c))
+    # strip + cast first; the regex only runs for values that still aren't numeric
+    # (e.g. "No Discount" in listed_price)
+    stripped = F.translate(F.col(c), NUMERIC_NOISE_CHARS, "")
+    return F.coalesce(stripped.cast("double"), regex_to_double(stripped))
+
+def convert(c):
+    if c in numeric_cols:
+        return to_double(c).alias(c)
+    if c == "collected_at":
+        return F.to_timestamp(c).alias(c)
+    return F.col(c)
+
+# all conversions in one projection (keeps column order)
+df = df.select([convert(c) for c in df.columns])
 
 # -----------------------
 # Step 5: Feature Engineering
 # -----------------------
-if "listed_price" in df.columns and "current_discounted_price" in df.columns:
-    df = df.withColumn("discount_amount", F.col("listed_price") - F.col("current_discounted_price"))
+derived = []
+
+if "collected_at" in df.columns:
+    derived += [
+        F.year("collected_at").alias("crawl_year"),
+        F.month("collected_at").alias("crawl_month"),
+    ]
 
-if "discount_amount" in df.columns:
-    df = df.withColumn("discount_flag", F.when(F.col("discount_amount") > 0, 1).otherwise(0))
+if "listed_price" in df.columns and "current_discounted_price" in df.columns:
+    discount_amount = F.col("listed_price") - F.col("current_discounted_price")
+    derived += [
+        discount_amount.alias("discount_amount"),
+        F.when(discount_amount > 0, 1).otherwise(0).alias("discount_flag"),
+    ]
 
 if "rating" in df.columns:
-    df = df.withColumn(
-        "rating_bucket",
+    derived.append(
         F.when(F.col("rating") >= 4.5, "Excellent")
          .when(F.col("rating") >= 3.5, "Good")
          .when(F.col("rating") >= 2.5, "Average")
          .otherwise("Poor")
+         .alias("rating_bucket")
     )
 
 if "about_product" in df.columns:
-    df = df.withColumn("about_product_length", F.length("about_product"))
+    derived.append(F.length("about_product").alias("about_product_length"))
+
+# all derived columns added in a single final projection
+df = df.select("*", *derived)
 
 # -----------------------
 # Step 6: Write Parquet (partitioned)
 # -----------------------
+# larger row groups → fewer range GETs when the split job reads transformed/
+spark.conf.set("parquet.block.size", str(256 * 1024 * 1024))
+spark.conf.set("parquet.page.size", str(1024 * 1024))
+
 try:
+    writer = df.write.mode("overwrite").option("compression", "zstd")
     if "crawl_year" in df.columns and "crawl_month" in df.columns:
         # enable dynamic partition overwrite to avoid wiping unrelated partitions
         spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
-        df.write.mode("overwrite").option("partitionOverwriteMode", "dynamic").partitionBy("crawl_year", "crawl_month").parquet(TRANSFORMED_PATH)
+        writer.option("partitionOverwriteMode", "dynamic").partitionBy("crawl_year", "crawl_month").parquet(TRANSFORMED_PATH)
         logger.info("Transformation complete with partitioning by crawl_year/crawl_month")
     else:
-        df.write.mode("overwrite").parquet(TRANSFORMED_PATH)
+        writer.parquet(TRANSFORMED_PATH)
         logger.info("Transformation complete without partitioning")
     job.commit()
 except Exception as e:
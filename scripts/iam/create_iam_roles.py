@@ -1,6 +1,11 @@
+import argparse
 import boto3
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 # ----------------------------
 # Logging setup
@@ -12,89 +17,124 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ----------------------------
-# AWS clients
+# AWS clients (one shared session)
 # ----------------------------
-iam = boto3.client("iam")
-sts = boto3.client("sts")
+session = boto3.session.Session()
+# adaptive retries absorb IAM throttling when roles are provisioned in parallel
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+iam = session.client("iam", config=BOTO_CONFIG)
+sts = session.client("sts", config=BOTO_CONFIG)
 account_id = sts.get_caller_identity()["Account"]
 
+MAX_WORKERS = 8
+# account id → {role name → ARN} for roles already provisioned by a previous run
+ROLE_CACHE_FILE = os.path.expanduser("~/.cache/dw_iam_roles.json")
+
 # ----------------------------
 # Helper function
 # ----------------------------
-def create_role_if_not_exists(role_name, assume_policy, description):
+def create_role_if_not_exists(role_name, assume_policy_json, description):
     """
     Creates IAM role if not exists. Returns role ARN.
+    `assume_policy_json` is the already-serialized trust policy document.
     """
     try:
         iam.get_role(RoleName=role_name)
         logger.info(f"ℹ️ Role {role_name} already exists")
         return f"arn:aws:iam::{account_id}:role/{role_name}"
-    except iam.exceptions.NoSuchEntityException:
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchEntity":
+            raise
         role = iam.create_role(
             RoleName=role_name,
-            AssumeRolePolicyDocument=json.dumps(assume_policy),
+            AssumeRolePolicyDocument=assume_policy_json,
             Description=description
         )
         logger.info(f"✅ Created role {role_name}")
         return role["Role"]["Arn"]
 
 
-def attach_policies(role_name, policy_arns):
+def attach_policy(role_name, policy_arn):
+    iam.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
+    logger.info(f"🔗 Attached {policy_arn.split('/')[-1]} to {role_name}")
+
+
+def put_inline_policy(role_name, inline_policy):
+    policy_name, policy_json = inline_policy
+    iam.put_role_policy(
+        RoleName=role_name,
+        PolicyName=policy_name,
+        PolicyDocument=policy_json
+    )
+    logger.info(f"🔗 Inline policy {policy_name} added to {role_name}")
+
+
+def attach_policies(role_name, policy_arns, inline_policy=None):
     """
-    Attaches managed policies to an IAM role.
+    Attaches managed policies (and the role's single inline policy) to an IAM role.
+    All calls are independent, so they are issued concurrently.
     """
-    for policy_arn in policy_arns:
-        iam.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
-        logger.info(f"🔗 Attached {policy_arn.split('/')[-1]} to {role_name}")
+    tasks = [lambda arn=arn: attach_policy(role_name, arn) for arn in policy_arns]
+    if inline_policy:
+        tasks.append(lambda: put_inline_policy(role_name, inline_policy))
+    if not tasks:
+        return
 
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(task) for task in tasks]
+    for future in futures:
+        future.result()  # surface the first failure
 
-# ----------------------------
-# 1️⃣ Glue ETL Role
-# ----------------------------
-glue_assume_policy = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {"Effect": "Allow", "Principal": {"Service": "glue.amazonaws.com"}, "Action": "sts:AssumeRole"}
-    ]
-}
 
-glue_role_arn = create_role_if_not_exists(
-    "glue-etl-role",
-    glue_assume_policy,
-    "Role for Glue ETL"
-)
+def ensure_role(role_name, assume_policy_json, description, policy_arns, inline_policy=None):
+    """
+    Creates the role (if needed) and attaches its policies. Returns role ARN.
+    """
+    role_arn = create_role_if_not_exists(role_name, assume_policy_json, description)
+    attach_policies(role_name, policy_arns, inline_policy)
+    return role_arn
 
-attach_policies("glue-etl-role", [
-    "arn:aws:iam::aws:policy/service-role/AWSGlueServiceRole",
-    "arn:aws:iam::aws:policy/AmazonS3FullAccess",
-    "arn:aws:iam::aws:policy/CloudWatchLogsFullAccess"
-])
 
-# ----------------------------
-# 2️⃣ Lambda ETL Role
-# ----------------------------
-lambda_assume_policy = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {"Effect": "Allow", "Principal": {"Service": "lambda.amazonaws.com"}, "Action": "sts:AssumeRole"}
-    ]
-}
+def load_role_cache():
+    try:
+        with open(ROLE_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    # ignore anything that isn't a per-account mapping (e.g. an older flat cache)
+    return {acct: roles for acct, roles in cache.items() if isinstance(roles, dict)}
 
-lambda_role_arn = create_role_if_not_exists(
-    "lambda-etl-role",
-    lambda_assume_policy,
-    "Role for all Lambda functions in ETL pipeline"
-)
 
-attach_policies("lambda-etl-role", [
-    "arn:aws:iam::aws:policy/AmazonS3FullAccess",
-    "arn:aws:iam::aws:policy/AWSGlueConsoleFullAccess",
-    "arn:aws:iam::aws:policy/AmazonRedshiftFullAccess",
-    "arn:aws:iam::aws:policy/CloudWatchLogsFullAccess"
-])
+def save_role_cache(cache):
+    os.makedirs(os.path.dirname(ROLE_CACHE_FILE), exist_ok=True)
+    with open(ROLE_CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def to_json(document):
+    """Compact JSON (no whitespace) for IAM policy documents."""
+    return json.dumps(document, separators=(",", ":"))
+
+
+def assume_policy_for(service):
+    return {
+        "Version": "2012-10-17",
+        "Statement": [
+            {"Effect": "Allow", "Principal": {"Service": service}, "Action": "sts:AssumeRole"}
+        ]
+    }
+
 
-# ➕ Add inline policy to allow Lambda-to-Lambda invocation
-lambda_invoke_policy = {
+# ----------------------------
+# Inline policies (one combined document per role, serialized once)
+# ----------------------------
+# ➕ Allow Lambda-to-Lambda invocation
+lambda_inline_policy = ("AllowLambdaInvoke", to_json({
     "Version": "2012-10-17",
     "Statement": [
         {
@@ -103,63 +143,98 @@ lambda_invoke_policy = {
             "Resource": "*"
         }
     ]
-}
-iam.put_role_policy(
-    RoleName="lambda-etl-role",
-    PolicyName="AllowLambdaInvoke",
-    PolicyDocument=json.dumps(lambda_invoke_policy)
-)
-logger.info("🔗 Inline policy added to allow Lambda → Lambda invocation")
-
+}))
 
-# ----------------------------
-# 3️⃣ Redshift COPY Role
-# ----------------------------
-redshift_assume_policy = {
+# ➕ Let EventBridge notify the Glue workflow
+events_inline_policy = ("AllowGlueNotifyEvent", to_json({
     "Version": "2012-10-17",
     "Statement": [
-        {"Effect": "Allow", "Principal": {"Service": "redshift.amazonaws.com"}, "Action": "sts:AssumeRole"}
-    ]
-}
-
-redshift_role_arn = create_role_if_not_exists(
-    "redshift-copy-role",
-    redshift_assume_policy,
-    "Role for Redshift COPY command from S3"
-)
-
-attach_policies("redshift-copy-role", [
-    "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
-])
-
-
-# ----------------------------
-# 4️⃣ Glue Crawler Role
-# ----------------------------
-crawler_assume_policy = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {"Effect": "Allow", "Principal": {"Service": "glue.amazonaws.com"}, "Action": "sts:AssumeRole"}
+        {
+            "Effect": "Allow",
+            "Action": ["glue:notifyEvent"],
+            "Resource": f"arn:aws:glue:*:{account_id}:workflow/split-fact-dim-workflow"
+        }
     ]
-}
-
-crawler_role_arn = create_role_if_not_exists(
-    "glue-crawler-role",
-    crawler_assume_policy,
-    "Role for Glue Crawler"
-)
-
-attach_policies("glue-crawler-role", [
-    "arn:aws:iam::aws:policy/service-role/AWSGlueServiceRole",
-    "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
-])
-
-
-# ----------------------------
-# ✅ Final Summary
-# ----------------------------
-logger.info("\n🎯 All IAM roles created and updated successfully:")
-logger.info(f"🔹 Glue ETL Role ARN:       {glue_role_arn}")
-logger.info(f"🔹 Lambda ETL Role ARN:     {lambda_role_arn}")
-logger.info(f"🔹 Redshift COPY Role ARN:  {redshift_role_arn}")
-logger.info(f"🔹 Glue Crawler Role ARN:   {crawler_role_arn}")
+}))
+
+
+# ----------------------------
+# Role specs: (name, assume policy JSON, description, managed policies, inline policy)
+# ----------------------------
+# trust policies are static → serialize them once at import
+GLUE_ASSUME_JSON = to_json(assume_policy_for("glue.amazonaws.com"))
+LAMBDA_ASSUME_JSON = to_json(assume_policy_for("lambda.amazonaws.com"))
+REDSHIFT_ASSUME_JSON = to_json(assume_policy_for("redshift.amazonaws.com"))
+CRAWLER_ASSUME_JSON = GLUE_ASSUME_JSON
+EVENTS_ASSUME_JSON = to_json(assume_policy_for("events.amazonaws.com"))
+
+ROLES = [
+    # 1️⃣ Glue ETL Role
+    ("glue-etl-role", GLUE_ASSUME_JSON, "Role for Glue ETL", [
+        "arn:aws:iam::aws:policy/service-role/AWSGlueServiceRole",
+        "arn:aws:iam::aws:policy/AmazonS3FullAccess",
+        "arn:aws:iam::aws:policy/CloudWatchLogsFullAccess"
+    ], None),
+    # 2️⃣ Lambda ETL Role
+    ("lambda-etl-role", LAMBDA_ASSUME_JSON, "Role for all Lambda functions in ETL pipeline", [
+        "arn:aws:iam::aws:policy/AmazonS3FullAccess",
+        "arn:aws:iam::aws:policy/AWSGlueConsoleFullAccess",
+        "arn:aws:iam::aws:policy/AmazonRedshiftFullAccess",
+        "arn:aws:iam::aws:policy/CloudWatchLogsFullAccess"
+    ], lambda_inline_policy),
+    # 3️⃣ Redshift COPY Role
+    ("redshift-copy-role", REDSHIFT_ASSUME_JSON, "Role for Redshift COPY command from S3", [
+        "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
+    ], None),
+    # 4️⃣ Glue Crawler Role
+    ("glue-crawler-role", CRAWLER_ASSUME_JSON, "Role for Glue Crawler", [
+        "arn:aws:iam::aws:policy/service-role/AWSGlueServiceRole",
+        "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
+    ], None),
+    # 5️⃣ EventBridge → Glue workflow Role (inline policy only)
+    ("eventbridge-glue-role", EVENTS_ASSUME_JSON, "Role for EventBridge to start the Glue split workflow", [],
+     events_inline_policy),
+]
+
+
+# ----------------------------
+# Main
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Create the IAM roles for the data warehouse pipeline")
+    parser.add_argument("--force", action="store_true",
+                        help=f"ignore {ROLE_CACHE_FILE} and re-check every role against IAM")
+    args = parser.parse_args()
+
+    cache = load_role_cache()
+    # only trust entries for the account we're running against
+    role_arns = {} if args.force else dict(cache.get(account_id, {}))
+    pending = [spec for spec in ROLES if spec[0] not in role_arns]
+    for name in role_arns:
+        logger.info(f"⏩ Role {name} cached, skipping IAM calls")
+
+    # roles are independent → create them (and attach their policies) concurrently
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(ensure_role, *spec): spec[0] for spec in pending}
+            for future in as_completed(futures):
+                role_arns[futures[future]] = future.result()
+    finally:
+        # keep whatever was provisioned, even if another role failed
+        if pending:
+            cache[account_id] = role_arns
+            save_role_cache(cache)
+
+    # ----------------------------
+    # ✅ Final Summary
+    # ----------------------------
+    logger.info("\n🎯 All IAM roles created and updated successfully:")
+    logger.info(f"🔹 Glue ETL Role ARN:       {role_arns['glue-etl-role']}")
+    logger.info(f"🔹 Lambda ETL Role ARN:     {role_arns['lambda-etl-role']}")
+    logger.info(f"🔹 Redshift COPY Role ARN:  {role_arns['redshift-copy-role']}")
+    logger.info(f"🔹 Glue Crawler Role ARN:   {role_arns['glue-crawler-role']}")
+    logger.info(f"🔹 EventBridge Role ARN:    {role_arns['eventbridge-glue-role']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,206 @@
+import base64
 import boto3
+import hashlib
 import zipfile
 import os
+import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
-lambda_client = boto3.client("lambda")
-iam = boto3.client("iam")
+session = boto3.session.Session()
+# adaptive retries keep concurrent deploys under the Lambda control-plane limits
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+lambda_client = session.client("lambda", config=BOTO_CONFIG)
+iam = session.client("iam", config=BOTO_CONFIG)
+s3 = session.client("s3", config=BOTO_CONFIG)
 
 ROLE_NAME = "lambda-etl-role"
+DEPLOY_BUCKET = "dp-datawarehouse-solution-1"
+DEPLOY_PREFIX = "lambda_code/"
+
+# ---------------------------------
+# Utility: resolve the execution role
+# ---------------------------------
+def get_role_arn(role_name):
+    """Return the role ARN, or None if the role does not exist"""
+    try:
+        return iam.get_role(RoleName=role_name)["Role"]["Arn"]
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchEntity":
+            raise
+        logger.error(f"❌ IAM Role '{role_name}' not found. Please create it first.")
+        return None
 
 # ---------------------------------
 # Utility: zip a lambda file
 # ---------------------------------
 def zip_lambda(source_file, zip_file):
-    with zipfile.ZipFile(zip_file, "w") as z:
-        z.write(source_file, os.path.basename(source_file))
+    # fixed timestamp + permissions → byte-identical zip (and CodeSha256) for unchanged source
+    info = zipfile.ZipInfo(filename=os.path.basename(source_file), date_time=(1980, 1, 1, 0, 0, 0))
+    # create_system defaults to 0 on Windows, 3 elsewhere → pin it so the hash is the same on every OS
+    info.create_system = 3
+    info.external_attr = 0o644 << 16
+    info.compress_type = zipfile.ZIP_DEFLATED
+    with open(source_file, "rb") as f:
+        data = f.read()
+    # maximum deflate level → smallest artifact to upload (compression cost is negligible here)
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as z:
+        z.writestr(info, data, compresslevel=9)
     return zip_file
 
 # ---------------------------------
-# Deploy or update a lambda
+# Utility: Lambda-style code hash
+# ---------------------------------
+def file_sha256(path):
+    """SHA-256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def code_sha256(digest):
+    """Base64 SHA-256, the format Lambda reports as CodeSha256."""
+    return base64.b64encode(digest).decode()
+
+# ---------------------------------
+# Utility: stage the zip in S3
 # ---------------------------------
-def create_or_update_lambda(function_name, handler, zip_file, timeout=300, env_vars=None):
-    role_arn = iam.get_role(RoleName=ROLE_NAME)["Role"]["Arn"]
+def upload_code(zip_file, digest):
+    """
+    Upload the zip under a content-addressed key and return the Lambda Code location.
+    Identical zips map to the same key, so they are uploaded only once.
+    """
+    key = f"{DEPLOY_PREFIX}{digest.hex()}.zip"
+    try:
+        s3.head_object(Bucket=DEPLOY_BUCKET, Key=key)
+        logger.info(f"⏩ Code already staged: s3://{DEPLOY_BUCKET}/{key}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "404":
+            raise
+        # upload_file streams (and multiparts) from disk instead of holding the zip in memory
+        s3.upload_file(zip_file, DEPLOY_BUCKET, key, ExtraArgs={"ContentType": "application/zip"})
+        logger.info(f"⬆️ Staged code: s3://{DEPLOY_BUCKET}/{key}")
+    return {"S3Bucket": DEPLOY_BUCKET, "S3Key": key}
 
-    with open(zip_file, "rb") as f:
-        code_bytes = f.read()
+# ---------------------------------
+# Deploy or update a lambda
+# ---------------------------------
+def create_or_update_lambda(function_name, handler, zip_file, role_arn, timeout=300, env_vars=None):
+    digest = file_sha256(zip_file)
+    env_vars = env_vars or {}
 
+    # look the function up first → nothing is staged unless it is actually needed
     try:
-        # Try to create
-        response = lambda_client.create_function(
+        current = lambda_client.get_function_configuration(FunctionName=function_name)
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ResourceNotFoundException":
+            raise
+        lambda_client.create_function(
             FunctionName=function_name,
             Runtime="python3.11",
             Role=role_arn,
             Handler=handler,
-            Code={"ZipFile": code_bytes},
+            Code=upload_code(zip_file, digest),
             Timeout=timeout,
-            Environment={"Variables": env_vars or {}}
+            Environment={"Variables": env_vars}
         )
         logger.info(f"✅ Created Lambda: {function_name}")
-    except lambda_client.exceptions.ResourceConflictException:
-        # If exists, update code + config
+        return
+
+    # exists → only push what actually changed
+    if current["CodeSha256"] != code_sha256(digest):
         lambda_client.update_function_code(
-            FunctionName=function_name, ZipFile=code_bytes
+            FunctionName=function_name, **upload_code(zip_file, digest)
         )
+        # config can't be updated while the code update is still in progress
+        lambda_client.get_waiter("function_updated").wait(FunctionName=function_name)
+        logger.info(f"ℹ️ Updated code: {function_name}")
+    else:
+        logger.info(f"⏩ Code unchanged, skipped upload: {function_name}")
+
+    config_changed = (
+        current.get("Role") != role_arn
+        or current.get("Handler") != handler
+        or current.get("Timeout") != timeout
+        or current.get("Environment", {}).get("Variables", {}) != env_vars
+    )
+    if config_changed:
         lambda_client.update_function_configuration(
             FunctionName=function_name,
             Role=role_arn,
             Handler=handler,
             Timeout=timeout,
-            Environment={"Variables": env_vars or {}}
+            Environment={"Variables": env_vars}
         )
-        logger.info(f"ℹ️ Updated Lambda: {function_name}")
+        logger.info(f"ℹ️ Updated configuration: {function_name}")
+    else:
+        logger.info(f"⏩ Configuration unchanged: {function_name}")
 
 # ---------------------------------
-# Main deploy
+# Lambda specs
 # ---------------------------------
-if __name__ == "__main__":
+LAMBDAS = [
     # Lambda 1
-    zip1 = zip_lambda("lambda_1.py", "lambda_1.zip")
-    create_or_update_lambda(
-        "lambda-trigger-glue",
-        "lambda_1.lambda_handler",
-        zip1,
-        timeout=300,
-        env_vars={"GLUE_JOB_NAME": "glue-clean-transform"}
-    )
+    {
+        "source_file": "lambda_1.py",
+        "function_name": "lambda-trigger-glue",
+        "handler": "lambda_1.lambda_handler",
+        "timeout": 300,
+        "env_vars": {"GLUE_JOB_NAME": "glue-clean-transform"}
+    },
+    # (Glue Job 2 is started by EventBridge directly → see eventbridge/s3_glue_trigger.py)
+    # Lambda 3 (needs long timeout)
+    {
+        "source_file": "lambda_3.py",
+        "function_name": "lambda-load-redshift",
+        "handler": "lambda_3.lambda_handler",
+        "timeout": 900,  # ⬅️ Increased to 15 minutes
+        "env_vars": {
+            "BUCKET_NAME": "dp-datawarehouse-solution-1",
+            "CRAWLER_NAME": "product-data-crawler",
+            "DATABASE_NAME": "product_db",             # <- rename from GLUE_DATABASE
+            "GLUE_CRAWLER_ROLE": "glue-crawler-role",  # <- add this
+            "REDSHIFT_NAMESPACE": "dw-namespace",      # see item (2)
+            "REDSHIFT_WORKGROUP": "dw-workgroup",      # see item (2)
+            "REDSHIFT_DATABASE": "dev",                # <- rename from REDSHIFT_DB
+            "REDSHIFT_USER": "awsuser",
+            "REDSHIFT_PASSWORD": "Password123!"        # (use Secrets Manager later)
+        }
+    }
+]
 
-    # Lambda 2 (no pandas!)
-    zip2 = zip_lambda("lambda_2.py", "lambda_2.zip")
+def deploy_lambda(spec, role_arn):
+    zip_file = zip_lambda(spec["source_file"], spec["source_file"].replace(".py", ".zip"))
     create_or_update_lambda(
-        "lambda-split-fact-dim",
-        "lambda_2.lambda_handler",
-        zip2,
-        timeout=300,
-        env_vars={"BUCKET_NAME": "dp-datawarehouse-solution-1"}
+        spec["function_name"],
+        spec["handler"],
+        zip_file,
+        role_arn,
+        timeout=spec["timeout"],
+        env_vars=spec["env_vars"]
     )
 
-    # Lambda 3 (needs long timeout)
-    zip3 = zip_lambda("lambda_3.py", "lambda_3.zip")
-    create_or_update_lambda(
-        "lambda-load-redshift",
-        "lambda_3.lambda_handler",
-        zip3,
-        timeout=900,  # ⬅️ Increased to 15 minutes
-        # deploy_lambdas.py  (Lambda 3 envs)
-    env_vars={
-        "BUCKET_NAME": "dp-datawarehouse-solution-1",
-        "CRAWLER_NAME": "product-data-crawler",
-        "DATABASE_NAME": "product_db",             # <- rename from GLUE_DATABASE
-        "GLUE_CRAWLER_ROLE": "glue-crawler-role",  # <- add this
-        "REDSHIFT_NAMESPACE": "dw-namespace",      # see item (2)
-        "REDSHIFT_WORKGROUP": "dw-workgroup",      # see item (2)
-        "REDSHIFT_DATABASE": "dev",                # <- rename from REDSHIFT_DB
-        "REDSHIFT_USER": "awsuser",
-        "REDSHIFT_PASSWORD": "Password123!"        # (use Secrets Manager later)
-    }
+# ---------------------------------
+# Main deploy
+# ---------------------------------
+if __name__ == "__main__":
+    # resolved once, before any zipping → fail fast if the role is missing
+    role_arn = get_role_arn(ROLE_NAME)
+    if not role_arn:
+        sys.exit(1)
 
-    )
-    logger.info("🚀 All Lambdas deployed/updated.")
\ No newline at end of file
+    # deployments are independent uploads/API calls → run them concurrently
+    with ThreadPoolExecutor(max_workers=len(LAMBDAS)) as executor:
+        list(executor.map(lambda spec: deploy_lambda(spec, role_arn), LAMBDAS))
+    logger.info("🚀 All Lambdas deployed/updated.")
@@ -2,45 +2,154 @@
 import boto3
 import logging
 import os
+import random
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 # ---------------- Logging Setup ----------------
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 # ---------------- AWS Clients ----------------
-redshift = boto3.client("redshift-serverless")
-redshift_data = boto3.client("redshift-data")
-glue = boto3.client("glue")
-sts = boto3.client("sts")
+# created once per container (cold start) and shared by all invocations
+session = boto3.session.Session()
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
 
-def wait_for_workgroup_available(workgroup, max_seconds=900, poll_interval=15):
-    waited = 0
+redshift = session.client("redshift-serverless", config=BOTO_CONFIG)
+redshift_data = session.client("redshift-data", config=BOTO_CONFIG)
+glue = session.client("glue", config=BOTO_CONFIG)
+sts = session.client("sts", config=BOTO_CONFIG)
+
+# invariant per function → resolved on cold start only
+ACCOUNT_ID = sts.get_caller_identity()["Account"]
+COPY_ROLE_ARN = f"arn:aws:iam::{ACCOUNT_ID}:role/redshift-copy-role"
+
+# ---------------- Configuration ----------------
+# read once per container; a missing variable is reported when the handler runs
+try:
+    BUCKET = os.environ["BUCKET_NAME"]
+    CRAWLER = os.environ["CRAWLER_NAME"]
+    GLUE_DATABASE = os.environ["DATABASE_NAME"]          # Glue Catalog db
+    CRAWLER_ROLE = os.environ["GLUE_CRAWLER_ROLE"]       # IAM role name only (e.g. glue-crawler-role)
+    NAMESPACE = os.environ["REDSHIFT_NAMESPACE"]
+    WORKGROUP = os.environ["REDSHIFT_WORKGROUP"]
+    REDSHIFT_DB = os.environ["REDSHIFT_DATABASE"]
+    ADMIN_USER = os.environ["REDSHIFT_USER"]
+    ADMIN_PASSWORD = os.environ["REDSHIFT_PASSWORD"]
+    CONFIG_ERROR = None
+except KeyError as missing:
+    CONFIG_ERROR = f"❌ Missing required environment variable: {missing}"
+else:
+    CRAWLER_ROLE_ARN = f"arn:aws:iam::{ACCOUNT_ID}:role/{CRAWLER_ROLE}"
+
+# ---------------- Static SQL ----------------
+# Redshift tables (idempotent)
+DDL_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS dim_product (
+        product_name VARCHAR(255),
+        category VARCHAR(255),
+        PRIMARY KEY(product_name)
+    )
+    DISTSTYLE ALL;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dim_date (
+        crawl_year INT,
+        crawl_month INT,
+        PRIMARY KEY(crawl_year, crawl_month)
+    )
+    DISTSTYLE ALL;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fact_sales (
+        product_name VARCHAR(255),
+        current_discounted_price DOUBLE PRECISION,
+        listed_price DOUBLE PRECISION,
+        rating DOUBLE PRECISION,
+        number_of_reviews DOUBLE PRECISION,
+        discount_amount DOUBLE PRECISION,
+        discount_flag INT,
+        rating_bucket VARCHAR(50),
+        crawl_year INT,
+        crawl_month INT,
+        FOREIGN KEY (product_name) REFERENCES dim_product(product_name),
+        FOREIGN KEY (crawl_year, crawl_month) REFERENCES dim_date(crawl_year, crawl_month)
+    )
+    DISTSTYLE KEY
+    DISTKEY(product_name)
+    SORTKEY(crawl_year, crawl_month);
+    """
+)
+
+TABLES = ("dim_product", "dim_date", "fact_sales")
+TRUNCATES = tuple(f"TRUNCATE TABLE {t};" for t in TABLES)
+# curated/<table>/ parquet → <table>; needs BUCKET, so only built when the configuration loaded
+COPY_STATEMENTS = () if CONFIG_ERROR else tuple(
+    f"COPY {t} FROM 's3://{BUCKET}/curated/{t}/' IAM_ROLE '{COPY_ROLE_ARN}' FORMAT AS PARQUET;"
+    for t in TABLES
+)
+
+THROTTLING_CODES = ("Throttling", "ThrottlingException", "TooManyRequestsException")
+
+def poll(fn, predicate, max_seconds, base=1.0, cap=30.0):
+    """
+    Call fn() until predicate(result) is true, sleeping with truncated exponential
+    backoff (base * 2**attempt, capped, plus jitter). Throttling doubles the delay.
+    Returns True when the predicate matched, False on timeout.
+    """
+    deadline = time.monotonic() + max_seconds
+    attempt = 0
+    throttle_factor = 1
     while True:
+        try:
+            if predicate(fn()):
+                return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in THROTTLING_CODES:
+                raise
+            throttle_factor *= 2
+            logger.warning(f"⚠️ Throttled while polling, backing off: {e}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        delay = min(cap, base * 2 ** attempt * throttle_factor + random.uniform(0, 0.5))
+        time.sleep(min(delay, remaining))
+        attempt += 1
+
+def wait_for_workgroup_available(workgroup, max_seconds=900):
+    # use a botocore waiter when the installed version ships one
+    if "workgroup_available" in redshift.waiter_names:
+        redshift.get_waiter("workgroup_available").wait(workgroupName=workgroup)
+        return True
+
+    def status():
         wg = redshift.get_workgroup(workgroupName=workgroup)["workgroup"]
-        status = wg.get("status")
-        logger.info(f"Workgroup status = {status}")
-        if status == "AVAILABLE":
-            return True
-        if waited >= max_seconds:
-            raise TimeoutError(f"Workgroup {workgroup} not AVAILABLE after {max_seconds}s")
-        time.sleep(poll_interval)
-        waited += poll_interval
-
-def wait_for_crawler_ready(crawler_name, max_seconds=600, poll_interval=15):
-    waited = 0
-    while True:
+        logger.info(f"Workgroup status = {wg.get('status')}")
+        return wg.get("status")
+
+    if not poll(status, lambda s: s == "AVAILABLE", max_seconds):
+        raise TimeoutError(f"Workgroup {workgroup} not AVAILABLE after {max_seconds}s")
+    return True
+
+def wait_for_crawler_ready(crawler_name, max_seconds=600):
+    def state():
         crawler = glue.get_crawler(Name=crawler_name)["Crawler"]
-        state = crawler.get("State")
-        logger.info(f"Crawler '{crawler_name}' state = {state}")
-        # Glue states: RUNNING, READY, STOPPING, etc. We want READY (idle)
-        if state == "READY":
-            return True
-        if waited >= max_seconds:
-            raise TimeoutError(f"Crawler {crawler_name} not READY after {max_seconds}s")
-        time.sleep(poll_interval)
-        waited += poll_interval
+        logger.info(f"Crawler '{crawler_name}' state = {crawler.get('State')}")
+        return crawler.get("State")
+
+    # Glue states: RUNNING, READY, STOPPING, etc. We want READY (idle)
+    if not poll(state, lambda s: s == "READY", max_seconds):
+        raise TimeoutError(f"Crawler {crawler_name} not READY after {max_seconds}s")
+    return True
 
 def execute_sql(workgroup, database, sql):
     resp = redshift_data.execute_statement(WorkgroupName=workgroup, Database=database, Sql=sql)
@@ -48,25 +157,39 @@ def execute_sql(workgroup, database, sql):
     logger.info(f"Submitted SQL. statement_id={stmt_id}")
     return stmt_id
 
+def execute_sql_batch(workgroup, database, sqls):
+    """Submit several statements with one API call (run in order, in one transaction)."""
+    resp = redshift_data.batch_execute_statement(WorkgroupName=workgroup, Database=database, Sqls=list(sqls))
+    stmt_id = resp.get("Id")
+    logger.info(f"Submitted SQL batch of {len(sqls)} statements. statement_id={stmt_id}")
+    return stmt_id
+
+def wait_for_statement(stmt_id, max_seconds=600):
+    """Wait until a (batch) statement finishes; logs each sub-statement and raises on failure."""
+    desc = {}
+
+    def status():
+        desc.update(redshift_data.describe_statement(Id=stmt_id))
+        return desc["Status"]
+
+    if not poll(status, lambda s: s in ("FINISHED", "FAILED", "ABORTED"), max_seconds):
+        raise TimeoutError(f"Statement {stmt_id} not finished after {max_seconds}s")
+
+    for sub in desc.get("SubStatements", []):
+        logger.info(f"  ↳ sub-statement {sub.get('Id')} status={sub.get('Status')}")
+    if desc["Status"] != "FINISHED":
+        raise RuntimeError(f"Statement {stmt_id} {desc['Status']}: {desc.get('Error')}")
+    return desc
+
+def ensure_redshift_tables():
+    stmt_id = execute_sql_batch(WORKGROUP, REDSHIFT_DB, DDL_STATEMENTS)
+    wait_for_statement(stmt_id)
+    logger.info(f"DDL executed (stmt_id={stmt_id})")
+
 def lambda_handler(event, context):
     try:
-        account_id = sts.get_caller_identity()["Account"]
-
-        # -----------------------
-        # Environment variables
-        # -----------------------
-        bucket = os.environ["BUCKET_NAME"]
-        crawler = os.environ["CRAWLER_NAME"]
-        db_name = os.environ["DATABASE_NAME"]        # Glue Catalog db
-        role_name = os.environ["GLUE_CRAWLER_ROLE"]  # IAM role name only (e.g. glue-crawler-role)
-        namespace = os.environ["REDSHIFT_NAMESPACE"]
-        workgroup = os.environ["REDSHIFT_WORKGROUP"]
-        db = os.environ["REDSHIFT_DATABASE"]
-        admin_user = os.environ["REDSHIFT_USER"]
-        admin_pass = os.environ["REDSHIFT_PASSWORD"]
-
-        role_arn = f"arn:aws:iam::{account_id}:role/{role_name}"
-        copy_role = f"arn:aws:iam::{account_id}:role/redshift-copy-role"
+        if CONFIG_ERROR:
+            raise EnvironmentError(CONFIG_ERROR)
 
         logger.info("🚀 Lambda 3 triggered - starting Redshift + Glue setup.")
 
@@ -74,176 +197,133 @@ def lambda_handler(event, context):
         # Ensure Redshift Namespace
         # -----------------------
         try:
-            redshift.get_namespace(namespaceName=namespace)
-            logger.info(f"ℹ️ Namespace {namespace} already exists")
-        except redshift.exceptions.ResourceNotFoundException:
-            logger.info(f"Namespace {namespace} not found. Creating...")
+            redshift.get_namespace(namespaceName=NAMESPACE)
+            logger.info(f"ℹ️ Namespace {NAMESPACE} already exists")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise
+            logger.info(f"Namespace {NAMESPACE} not found. Creating...")
             redshift.create_namespace(
-                namespaceName=namespace,
-                adminUsername=admin_user,
-                adminUserPassword=admin_pass,
-                iamRoles=[copy_role]
+                namespaceName=NAMESPACE,
+                adminUsername=ADMIN_USER,
+                adminUserPassword=ADMIN_PASSWORD,
+                iamRoles=[COPY_ROLE_ARN]
             )
-            logger.info(f"✅ Created Redshift namespace: {namespace}")
+            logger.info(f"✅ Created Redshift namespace: {NAMESPACE}")
 
         # -----------------------
         # Ensure Redshift Workgroup
         # -----------------------
         try:
-            redshift.get_workgroup(workgroupName=workgroup)
-            logger.info(f"ℹ️ Workgroup {workgroup} already exists")
-        except redshift.exceptions.ResourceNotFoundException:
-            logger.info(f"Workgroup {workgroup} not found. Creating...")
+            redshift.get_workgroup(workgroupName=WORKGROUP)
+            logger.info(f"ℹ️ Workgroup {WORKGROUP} already exists")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise
+            logger.info(f"Workgroup {WORKGROUP} not found. Creating...")
             redshift.create_workgroup(
-                workgroupName=workgroup,
-                namespaceName=namespace,
+                workgroupName=WORKGROUP,
+                namespaceName=NAMESPACE,
                 baseCapacity=8
             )
-            logger.info(f"✅ Created Redshift workgroup: {workgroup}")
+            logger.info(f"✅ Created Redshift workgroup: {WORKGROUP}")
 
         # Wait until workgroup is AVAILABLE (bounded wait)
         logger.info("⏳ Waiting for workgroup to become AVAILABLE...")
-        wait_for_workgroup_available(workgroup, max_seconds=900, poll_interval=15)
+        wait_for_workgroup_available(WORKGROUP, max_seconds=900)
         logger.info("✅ Redshift workgroup AVAILABLE")
 
         # -----------------------
-        # Ensure Glue Database exists
-        # -----------------------
-        try:
-            glue.get_database(Name=db_name)
-            logger.info(f"ℹ️ Glue database '{db_name}' already exists")
-        except glue.exceptions.EntityNotFoundException:
-            logger.info(f"Glue database '{db_name}' not found. Creating...")
-            glue.create_database(DatabaseInput={"Name": db_name})
-            logger.info(f"✅ Created Glue database: {db_name}")
-
-        # -----------------------
-        # Ensure Glue Crawler
+        # Create Redshift Tables (idempotent)
         # -----------------------
+        # The DDL doesn't depend on the Glue catalog → run it in the background
+        # while the crawler works; joined before TRUNCATE/COPY below
+        ddl_executor = ThreadPoolExecutor(max_workers=1)
+        ddl_future = ddl_executor.submit(ensure_redshift_tables)
         try:
-            glue.get_crawler(Name=crawler)
-            logger.info(f"ℹ️ Glue crawler '{crawler}' already exists")
-        except glue.exceptions.EntityNotFoundException:
-            logger.info(f"Glue crawler '{crawler}' not found. Creating...")
+            # -----------------------
+            # Ensure Glue Database exists
+            # -----------------------
             try:
-                glue.create_crawler(
-                    Name=crawler,
-                    Role=role_arn,
-                    DatabaseName=db_name,
-                    Targets={"S3Targets": [{"Path": f"s3://{bucket}/curated/"}]},
-                    TablePrefix="curated_"
-                )
-                logger.info(f"✅ Created crawler '{crawler}' successfully")
-            except Exception as create_err:
-                logger.error(f"❌ Failed to create crawler '{crawler}': {create_err}")
-                raise
-
-        # Start crawler and wait for it to finish
-        try:
-            glue.start_crawler(Name=crawler)
-            logger.info(f"🚀 Started crawler '{crawler}'")
-        except Exception as start_err:
-            logger.error(f"❌ Failed to start crawler '{crawler}': {start_err}")
-            raise
+                glue.get_database(Name=GLUE_DATABASE)
+                logger.info(f"ℹ️ Glue database '{GLUE_DATABASE}' already exists")
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "EntityNotFoundException":
+                    raise
+                logger.info(f"Glue database '{GLUE_DATABASE}' not found. Creating...")
+                glue.create_database(DatabaseInput={"Name": GLUE_DATABASE})
+                logger.info(f"✅ Created Glue database: {GLUE_DATABASE}")
 
-        logger.info("⏳ Waiting for crawler to finish (state=READY)...")
-        wait_for_crawler_ready(crawler, max_seconds=600, poll_interval=15)
-        logger.info("✅ Crawler finished and metadata refreshed")
-
-        # -----------------------
-        # Create Redshift Tables (idempotent)
-        # -----------------------
-        ddl_statements = [
-            """
-            CREATE TABLE IF NOT EXISTS dim_product (
-                product_name VARCHAR(255),
-                category VARCHAR(255),
-                PRIMARY KEY(product_name)
-            )
-            DISTSTYLE ALL;
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS dim_date (
-                crawl_year INT,
-                crawl_month INT,
-                PRIMARY KEY(crawl_year, crawl_month)
-            )
-            DISTSTYLE ALL;
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS fact_sales (
-                product_name VARCHAR(255),
-                current_discounted_price DOUBLE PRECISION,
-                listed_price DOUBLE PRECISION,
-                rating DOUBLE PRECISION,
-                number_of_reviews DOUBLE PRECISION,
-                discount_amount DOUBLE PRECISION,
-                discount_flag INT,
-                rating_bucket VARCHAR(50),
-                crawl_year INT,
-                crawl_month INT,
-                FOREIGN KEY (product_name) REFERENCES dim_product(product_name),
-                FOREIGN KEY (crawl_year, crawl_month) REFERENCES dim_date(crawl_year, crawl_month)
-            )
-            DISTSTYLE KEY
-            DISTKEY(product_name)
-            SORTKEY(crawl_year, crawl_month);
-            """
-        ]
+            # -----------------------
+            # Ensure Glue Crawler
+            # -----------------------
+            try:
+                glue.get_crawler(Name=CRAWLER)
+                logger.info(f"ℹ️ Glue crawler '{CRAWLER}' already exists")
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "EntityNotFoundException":
+                    raise
+                logger.info(f"Glue crawler '{CRAWLER}' not found. Creating...")
+                try:
+                    glue.create_crawler(
+                        Name=CRAWLER,
+                        Role=CRAWLER_ROLE_ARN,
+                        DatabaseName=GLUE_DATABASE,
+                        Targets={"S3Targets": [{"Path": f"s3://{BUCKET}/curated/"}]},
+                        TablePrefix="curated_"
+                    )
+                    logger.info(f"✅ Created crawler '{CRAWLER}' successfully")
+                except Exception as create_err:
+                    logger.error(f"❌ Failed to create crawler '{CRAWLER}': {create_err}")
+                    raise
 
-        for ddl in ddl_statements:
+            # Start crawler and wait for it to finish
             try:
-                stmt_id = execute_sql(workgroup, db, ddl)
-                logger.info(f"DDL executed (stmt_id={stmt_id})")
-            except Exception as ddl_err:
-                logger.error(f"❌ Error executing DDL: {ddl_err}")
-                logger.error(traceback.format_exc())
+                glue.start_crawler(Name=CRAWLER)
+                logger.info(f"🚀 Started crawler '{CRAWLER}'")
+            except Exception as start_err:
+                logger.error(f"❌ Failed to start crawler '{CRAWLER}': {start_err}")
                 raise
 
+            logger.info("⏳ Waiting for crawler to finish (state=READY)...")
+            wait_for_crawler_ready(CRAWLER, max_seconds=600)
+            logger.info("✅ Crawler finished and metadata refreshed")
+        finally:
+            # join on every path → the batch never outlives the handler and a
+            # DDL failure is logged even if the Glue steps failed first
+            ddl_executor.shutdown(wait=True)
+            ddl_err = ddl_future.exception()
+            if ddl_err:
+                logger.error(f"❌ Error executing DDL: {ddl_err}")
+                logger.error("".join(traceback.format_exception(ddl_err)))
+        if ddl_err:
+            raise ddl_err
+
         logger.info("✅ Redshift tables ensured")
 
         # -----------------------
         # TRUNCATE + COPY Load
         # -----------------------
-        tables = ["dim_product", "dim_date", "fact_sales"]
-        for t in tables:
-            try:
-                stmt_id = execute_sql(workgroup, db, f"TRUNCATE TABLE {t};")
-                logger.info(f"Truncate submitted for {t} (stmt_id={stmt_id})")
-            except Exception as trunc_err:
-                logger.error(f"❌ Failed to truncate {t}: {trunc_err}")
-                logger.error(traceback.format_exc())
-                raise
+        try:
+            stmt_id = execute_sql_batch(WORKGROUP, REDSHIFT_DB, TRUNCATES)
+            wait_for_statement(stmt_id)
+            logger.info(f"Truncate executed for {', '.join(TABLES)} (stmt_id={stmt_id})")
+        except Exception as trunc_err:
+            logger.error(f"❌ Failed to truncate tables: {trunc_err}")
+            logger.error(traceback.format_exc())
+            raise
 
-        copy_statements = [
-            f"""
-            COPY dim_product 
-            FROM 's3://{bucket}/curated/dim_product/' 
-            IAM_ROLE '{copy_role}' 
-            FORMAT AS PARQUET;
-            """,
-            f"""
-            COPY dim_date 
-            FROM 's3://{bucket}/curated/dim_date/' 
-            IAM_ROLE '{copy_role}' 
-            FORMAT AS PARQUET;
-            """,
-            f"""
-            COPY fact_sales  
-            FROM 's3://{bucket}/curated/fact_sales/'  
-            IAM_ROLE '{copy_role}' 
-            FORMAT AS PARQUET;
-            """
-        ]
-
-        for sql in copy_statements:
-            try:
-                stmt_id = execute_sql(workgroup, db, sql)
-                logger.info(f"COPY submitted (stmt_id={stmt_id})")
-            except Exception as copy_err:
-                logger.error(f"❌ COPY failed: {copy_err}")
-                logger.error(traceback.format_exc())
-                raise
+        # target tables are independent → load them in parallel instead of one batch
+        # (a batch runs its statements sequentially in a single transaction)
+        try:
+            with ThreadPoolExecutor(max_workers=len(COPY_STATEMENTS)) as executor:
+                stmt_ids = list(executor.map(lambda sql: execute_sql(WORKGROUP, REDSHIFT_DB, sql), COPY_STATEMENTS))
+                list(executor.map(wait_for_statement, stmt_ids))
+            logger.info(f"COPY executed (stmt_ids={stmt_ids})")
+        except Exception as copy_err:
+            logger.error(f"❌ COPY failed: {copy_err}")
+            logger.error(traceback.format_exc())
+            raise
 
         logger.info("🎯 Data successfully loaded into Redshift.")
         return {"status": "success"}
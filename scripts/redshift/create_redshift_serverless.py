@@ -1,6 +1,7 @@
 import boto3
 import logging
 import time
+from botocore.config import Config
 
 # -----------------------
 # Logging setup
@@ -10,11 +11,18 @@ logging.basicConfig(level=logging.INFO,
 logger = logging.getLogger(__name__)
 
 # -----------------------
-# AWS clients
+# AWS clients (one shared session)
 # -----------------------
-redshift = boto3.client("redshift-serverless")
-redshift_data = boto3.client("redshift-data")
-sts = boto3.client("sts")
+session = boto3.session.Session()
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 10, "mode": "adaptive"}
+)
+
+redshift = session.client("redshift-serverless", config=BOTO_CONFIG)
+redshift_data = session.client("redshift-data", config=BOTO_CONFIG)
+sts = session.client("sts", config=BOTO_CONFIG)
 account_id = sts.get_caller_identity()["Account"]
 
 # -----------------------
@@ -91,6 +99,22 @@ def wait_for_workgroup(timeout_minutes=20):
             raise TimeoutError(f"Timed out waiting for workgroup {WORKGROUP_NAME} (last status: {status})")
         time.sleep(15)
 
+# -----------------------
+# Wait for a SQL statement
+# -----------------------
+def wait_for_statement(stmt_id, timeout_minutes=5):
+    start = time.time()
+    while True:
+        desc = redshift_data.describe_statement(Id=stmt_id)
+        status = desc["Status"]
+        if status == "FINISHED":
+            return
+        if status in ("FAILED", "ABORTED"):
+            raise RuntimeError(f"Statement {stmt_id} {status}: {desc.get('Error')}")
+        if time.time() - start > timeout_minutes * 60:
+            raise TimeoutError(f"Timed out waiting for statement {stmt_id} (last status: {status})")
+        time.sleep(2)
+
 # -----------------------
 # Create BI user
 # -----------------------
@@ -103,12 +127,13 @@ def create_bi_user():
         f"ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT ON TABLES TO {BI_USER};"
     ]
 
-    for sql in sql_statements:
-        redshift_data.execute_statement(
-            WorkgroupName=WORKGROUP_NAME,
-            Database=DB_NAME,
-            Sql=sql
-        )
+    # one call for all statements; the batch runs them in order (user before grants)
+    stmt_id = redshift_data.batch_execute_statement(
+        WorkgroupName=WORKGROUP_NAME,
+        Database=DB_NAME,
+        Sqls=sql_statements
+    )["Id"]
+    wait_for_statement(stmt_id)
     logger.info(f"✅ BI user {BI_USER} created and granted SELECT privileges")
 
 # -----------------------